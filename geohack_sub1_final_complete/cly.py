@@ -2,7 +2,7 @@ import argparse
 from pathlib import Path
 from rich import print
 
-from ingest import load_pdf
+from ingest import load_pdf, page_pool
 from splitter import split_documents
 from embeddings import get_embedder
 from vectorstore import build_index, load_index
@@ -21,9 +21,10 @@ def cmd_index(args):
         return
 
     all_docs = []
-    for pdf in pdf_files:
-        d = load_pdf(pdf)
-        all_docs.extend(d)
+    with page_pool():
+        for pdf in pdf_files:
+            d = load_pdf(pdf)
+            all_docs.extend(d)
 
     splits = split_documents(all_docs, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
     embedder = get_embedder()
@@ -37,7 +38,8 @@ def cmd_summarize(args):
     pdf_path = Path(args.doc)
 
     docs = load_pdf(pdf_path)
-    db = load_index(index_dir, get_embedder())
+    embedder = get_embedder()
+    db = load_index(index_dir, embedder)
     chain = build_rag_chain()
 
     summary = generate_summary(
@@ -63,7 +65,8 @@ def cmd_summarize(args):
 
 
 def cmd_preview(args):
-    db = load_index(Path(args.index), get_embedder())
+    embedder = get_embedder()
+    db = load_index(Path(args.index), embedder)
     hits = db.similarity_search(args.query, k=args.k)
 
     print({"query": args.query, "topk": args.k})
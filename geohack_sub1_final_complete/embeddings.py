@@ -1,6 +1,91 @@
+import importlib.util
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
 from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
 
 EMBED_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_BATCH_SIZE = 64
+# max_seq_length from the model's sentence_bert_config.json; the tokenizer
+# itself allows 512, which would embed long chunks differently
+EMBED_MAX_SEQ_LENGTH = 256
+ONNX_CACHE_DIR = Path.home() / ".cache" / "geohack" / "all-MiniLM-L6-v2-onnx-int8"
+ONNX_FILE_NAME = "model_quantized.onnx"
+
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """MiniLM sentence embeddings served by ONNX Runtime with dynamic int8 weights."""
+
+    def __init__(self, model_name=EMBED_MODEL, cache_dir=ONNX_CACHE_DIR, batch_size=EMBED_BATCH_SIZE):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        cache_dir = Path(cache_dir)
+        if not (cache_dir / ONNX_FILE_NAME).exists():
+            self._export_quantized(model_name, cache_dir)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(cache_dir, file_name=ONNX_FILE_NAME)
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _export_quantized(model_name, cache_dir: Path):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(cache_dir)
+
+        quantizer = ORTQuantizer.from_pretrained(model)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=cache_dir, quantization_config=qconfig)
+
+    def _encode(self, texts):
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = self.tokenizer(
+                texts[start:start + self.batch_size],
+                padding=True,
+                truncation=True,
+                max_length=EMBED_MAX_SEQ_LENGTH,
+                return_tensors="np"
+            )
+            hidden = self.model(**batch).last_hidden_state
+            hidden = np.asarray(hidden, dtype=np.float32)
+
+            # Mean pooling over real tokens, then L2 normalization
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            vectors.extend(pooled.tolist())
+        return vectors
+
+    def embed_documents(self, texts):
+        return self._encode(list(texts))
+
+    def embed_query(self, text):
+        return self._encode([text])[0]
+
+
+def _cuda_available():
+    # Only torch can tell whether the HuggingFace path can use the GPU;
+    # skip the (slow) import entirely when torch is not installed
+    if importlib.util.find_spec("torch") is None:
+        return False
+    import torch
+    return torch.cuda.is_available()
+
 
+@lru_cache(maxsize=1)
 def get_embedder():
-    return HuggingFaceEmbeddings(model_name=EMBED_MODEL)
+    if _cuda_available():
+        return HuggingFaceEmbeddings(
+            model_name=EMBED_MODEL,
+            model_kwargs={"device": "cuda"},
+            encode_kwargs={"batch_size": EMBED_BATCH_SIZE, "normalize_embeddings": True}
+        )
+    return OnnxMiniLMEmbeddings()
@@ -1,17 +1,78 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
 import fitz
 from langchain.schema import Document
 from pathlib import Path
 
+from pdf_pages import extract_page_range
+
+# Measured with PyMuPDF on the bundled PDFs: 2-12 ms per page in-process,
+# under 1 ms per task on a warm pool, but ~0.2 s to start a spawn worker.
+# Smaller PDFs are parsed in-process even when a pool is available
+PARALLEL_MIN_PAGES = 32
+PDF_CACHE_SIZE = 8
+
+_pool = None
+
+
+@contextmanager
+def page_pool():
+    # Share one worker pool across every load_pdf call in the block;
+    # workers are only started once a PDF reaches PARALLEL_MIN_PAGES
+    global _pool
+    if (os.cpu_count() or 1) < 2:
+        yield
+        return
+    with ProcessPoolExecutor() as pool:
+        _pool = pool
+        try:
+            yield
+        finally:
+            _pool = None
+
+
+def _extract_pages_parallel(path: str, n_pages: int):
+    workers = min(os.cpu_count() or 1, n_pages)
+    step = -(-n_pages // workers)
+    futures = [
+        _pool.submit(extract_page_range, path, start, min(start + step, n_pages))
+        for start in range(0, n_pages, step)
+    ]
+    pages = []
+    for f in futures:
+        pages.extend(f.result())
+    return pages
+
 
 def load_pdf(path: Path):
+    # Key on mtime and size so an edited file is parsed again
+    st = os.stat(path)
+    cached = _load_pdf_cached(str(path), st.st_mtime_ns, st.st_size)
+    # Hand out fresh Documents (page text is an immutable str and is shared)
+    # so callers mutating page_content or metadata cannot corrupt the cache
+    return [Document(page_content=d.page_content, metadata=dict(d.metadata)) for d in cached]
+
+
+@lru_cache(maxsize=PDF_CACHE_SIZE)
+def _load_pdf_cached(path: str, mtime_ns: int, size: int):
     doc = fitz.open(path)
+    n_pages = len(doc)
+    if _pool is None or n_pages < PARALLEL_MIN_PAGES:
+        pages = [(i, page.get_text("text")) for i, page in enumerate(doc)]
+        doc.close()
+    else:
+        doc.close()
+        pages = _extract_pages_parallel(path, n_pages)
+
     docs = []
-    for i, page in enumerate(doc):
-        text = page.get_text("text")
+    for i, text in pages:
         docs.append(
             Document(
                 page_content=text,
                 metadata={"source": str(path), "page": i + 1}
             )
         )
-    return docs
+    return tuple(docs)
@@ -0,0 +1,11 @@
+import fitz
+
+
+# Kept apart from ingest so pool workers import only PyMuPDF, not langchain
+def extract_page_range(path: str, start: int, stop: int):
+    # fitz documents are not picklable, so each worker reopens the file
+    doc = fitz.open(path)
+    try:
+        return [(i, doc[i].get_text("text")) for i in range(start, stop)]
+    finally:
+        doc.close()
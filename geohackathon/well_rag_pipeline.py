@@ -18,6 +18,8 @@ import os
 import re
 import json
 import math
+import hashlib
+import tempfile
 import argparse
 import warnings
 from pathlib import Path
@@ -32,6 +34,29 @@ warnings.filterwarnings('ignore')
 # SECTION 1: PDF TEXT EXTRACTION
 # ============================================================================
 
+def extract_page_texts(pdf_path: str) -> List[str]:
+    """
+    Extract the text layer of every page with PyMuPDF (fitz).
+    
+    Args:
+        pdf_path: Path to PDF file
+        
+    Returns:
+        List of page texts, in page order
+    """
+    import fitz  # PyMuPDF
+    
+    # Open by path: MuPDF reads the file on demand through its own C stream.
+    # Passing stream= would require the whole PDF as a Python bytes object.
+    doc = fitz.open(pdf_path)
+    try:
+        if doc.is_encrypted:
+            raise ValueError("PDF is encrypted. Please provide decrypted version.")
+        return [page.get_text("text") for page in doc]
+    finally:
+        doc.close()
+
+
 def extract_pdf_text(pdf_path: str) -> str:
     """
     Extract text from PDF using multiple fallback methods:
@@ -45,17 +70,7 @@ def extract_pdf_text(pdf_path: str) -> str:
         Extracted text as string
     """
     try:
-        import fitz  # PyMuPDF
-        
-        doc = fitz.open(pdf_path)
-        if doc.is_encrypted:
-            raise ValueError("PDF is encrypted. Please provide decrypted version.")
-        
-        text_chunks = []
-        for page in doc:
-            text_chunks.append(page.get_text("text"))
-        
-        text = "\n".join(text_chunks).strip()
+        text = "\n".join(extract_page_texts(pdf_path)).strip()
         
         # If text layer yields sufficient content, use it
         if len(text) > 500:
@@ -90,6 +105,13 @@ def extract_pdf_text(pdf_path: str) -> str:
 # SECTION 2: TEXT PREPROCESSING
 # ============================================================================
 
+# Only runs that actually change (2+ blanks, or any tab); lone spaces are skipped
+_WS_RE = re.compile(r'[ \t]{2,}|\t')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_BULLETS_RE = re.compile(r'[•●■□▪▫]')
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7F]+')
+
+
 def clean_text(text: str) -> str:
     """
     Clean and normalize extracted text.
@@ -104,12 +126,12 @@ def clean_text(text: str) -> str:
         return ""
     
     # Normalize whitespace
-    text = re.sub(r'[ \t]+', ' ', text)
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = _WS_RE.sub(' ', text)
+    text = _BLANK_LINES_RE.sub('\n\n', text)
     
     # Remove common OCR artifacts
-    text = re.sub(r'[•●■□▪▫]', '-', text)  # Bullets
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)  # Non-ASCII
+    text = _BULLETS_RE.sub('-', text)  # Bullets
+    text = _NON_ASCII_RE.sub(' ', text)  # Non-ASCII
     
     return text.strip()
 
@@ -129,17 +151,12 @@ def chunk_text(text: str, chunk_size: int = 1500, overlap: int = 300) -> List[st
     if not text:
         return []
     
-    chunks = []
-    start = 0
-    text_len = len(text)
-    
-    while start < text_len:
-        end = min(text_len, start + chunk_size)
-        chunks.append(text[start:end])
-        start += (chunk_size - overlap)
-        
-        if start <= 0:  # Prevent infinite loop
-            break
+    step = chunk_size - overlap
+    if step <= 0:
+        # Overlap swallows the whole window: keep a single leading chunk
+        chunks = [text[:chunk_size]]
+    else:
+        chunks = [text[start:start + chunk_size] for start in range(0, len(text), step)]
     
     print(f"[INFO] Created {len(chunks)} text chunks")
     return chunks
@@ -149,32 +166,175 @@ def chunk_text(text: str, chunk_size: int = 1500, overlap: int = 300) -> List[st
 # SECTION 3: RETRIEVAL SYSTEM (TF-IDF)
 # ============================================================================
 
-def build_retriever(chunks: List[str]):
+def _apply_tfidf_inplace(counts, idf, sublinear_tf: bool = True):
+    """
+    Weight a CSR count matrix by IDF and L2-normalize its rows in place.
+    
+    Equivalent to TfidfTransformer.transform, but scales counts.data by
+    idf[counts.indices] instead of multiplying by a sparse diagonal matrix,
+    which avoids building the diagonal and a second CSR result (the gathered
+    idf values are still a temporary array of length nnz).
+    
+    Args:
+        counts: CSR term-count matrix (modified in place)
+        idf: 1-D array of IDF weights, one per feature
+        sublinear_tf: Replace tf with 1 + log(tf), as TfidfTransformer does
+        
+    Returns:
+        The weighted, normalized matrix
+    """
+    import numpy as np
+    from sklearn.preprocessing import normalize
+    
+    if sublinear_tf:
+        np.log(counts.data, out=counts.data)
+        counts.data += 1
+    np.multiply(counts.data, idf[counts.indices], out=counts.data)
+    return normalize(counts, norm='l2', copy=False)
+
+
+def _top_k_indices(scores, k: int):
+    """
+    Indices of the k highest scores, best first.
+    
+    Uses np.argpartition (O(N)) and only sorts the k selected entries,
+    instead of a full O(N log N) argsort of every score.
+    """
+    import numpy as np
+    
+    if k < len(scores):
+        top = np.argpartition(scores, -k)[-k:]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top])]
+
+
+def _dump_atomic(obj: Any, path: str):
+    """
+    joblib.dump obj to path via a temporary file in the same directory, so an
+    interrupted run never leaves a truncated file at path. Failures only warn:
+    the cache is an optimization, not part of the result.
+    """
+    import joblib
+    
+    cache_dir = os.path.dirname(path)
+    tmp_path = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        os.close(fd)
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"[WARN] Could not write TF-IDF cache {path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def build_retriever(chunks: List[str], cache_dir: Optional[str] = None):
     """
     Build TF-IDF based retrieval system for semantic search.
     
     Args:
         chunks: List of text chunks
+        cache_dir: Optional directory where the fitted TF-IDF model is
+            persisted, keyed by a hash of the chunks, and reused on later runs
         
     Returns:
         Retrieval function
     """
     try:
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
+        import joblib
+        import numpy as np
+        import sklearn
+        from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
     except ImportError:
         raise RuntimeError("scikit-learn required. Install: pip install scikit-learn")
     
     if not chunks:
         return lambda q, k=5: []
     
-    vectorizer = TfidfVectorizer(
-        max_features=10000,
+    # Hashed term counts avoid building and storing a vocabulary dict;
+    # float32 halves the memory traffic of the similarity mat-vec.
+    # 2**20 buckets keep query n-grams that are absent from the report from
+    # colliding with features it does use; the CSR matrix stores only
+    # nonzeros, so the width costs just the 1-D idf array
+    vectorizer = HashingVectorizer(
+        n_features=2**20,
         ngram_range=(1, 2),
-        stop_words='english'
+        stop_words='english',
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float32
     )
-    
-    tfidf_matrix = vectorizer.fit_transform(chunks)
+    tfidf_transformer = TfidfTransformer(sublinear_tf=True)
+    
+    cache_path = None
+    if cache_dir:
+        # Key on the chunk contents, the model settings and the scikit-learn
+        # version so stale or incompatible fits are never reused
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(sklearn.__version__.encode('utf-8'))
+        digest.update(repr(sorted(vectorizer.get_params().items())).encode('utf-8'))
+        digest.update(repr(sorted(tfidf_transformer.get_params().items())).encode('utf-8'))
+        for chunk in chunks:
+            digest.update(chunk.encode('utf-8'))
+            digest.update(b'\0')
+        cache_path = os.path.join(cache_dir, f"{digest.hexdigest()}.joblib")
+    
+    tfidf_matrix = None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            cached_transformer, cached_matrix = joblib.load(cache_path)
+            idf = cached_transformer.idf_.astype(np.float32)
+            tfidf_transformer, tfidf_matrix = cached_transformer, cached_matrix
+            print(f"[INFO] Loaded cached TF-IDF model: {cache_path}")
+        except Exception as e:
+            # Truncated or unreadable cache file: refit and overwrite it below
+            print(f"[WARN] Ignoring unreadable TF-IDF cache {cache_path}: {type(e).__name__}: {e}")
+    
+    if tfidf_matrix is None:
+        # Rows are L2-normalized, so a plain dot product is the cosine similarity
+        counts = vectorizer.transform(chunks)
+        tfidf_transformer.fit(counts)
+        idf = tfidf_transformer.idf_.astype(np.float32)
+        tfidf_matrix = _apply_tfidf_inplace(counts, idf, tfidf_transformer.sublinear_tf)
+        if cache_path:
+            _dump_atomic((tfidf_transformer, tfidf_matrix), cache_path)
+    
+    # Query n-grams absent from every chunk would otherwise get the maximum
+    # smoothed IDF and inflate the query norm; zero them, as a fitted
+    # vocabulary would simply drop them
+    seen = np.zeros(idf.shape[0], dtype=bool)
+    seen[tfidf_matrix.indices] = True
+    idf[~seen] = 0
+    
+    def retrieve_batch(queries: List[str], k: int = 5) -> List[List[Tuple[str, float]]]:
+        """
+        Retrieve top-k most relevant chunks for several queries at once.
+        
+        Args:
+            queries: Search queries
+            k: Number of results per query
+            
+        Returns:
+            One list of (chunk, score) tuples per query
+        """
+        query_matrix = _apply_tfidf_inplace(
+            vectorizer.transform(queries), idf, tfidf_transformer.sublinear_tf
+        )
+        # Shape (n_chunks, n_queries): one column of similarities per query
+        similarities = (tfidf_matrix @ query_matrix.T).toarray()
+        
+        k = min(k, similarities.shape[0])
+        if k <= 0:
+            return [[] for _ in queries]
+        
+        results = []
+        for col in similarities.T:
+            top_indices = _top_k_indices(col, k)
+            results.append([(chunks[i], float(col[i])) for i in top_indices])
+        return results
     
     def retrieve(query: str, k: int = 5) -> List[Tuple[str, float]]:
         """
@@ -187,12 +347,9 @@ def build_retriever(chunks: List[str]):
         Returns:
             List of (chunk, score) tuples
         """
-        query_vec = vectorizer.transform([query])
-        similarities = cosine_similarity(query_vec, tfidf_matrix)[0]
-        top_indices = similarities.argsort()[::-1][:k]
-        
-        return [(chunks[i], float(similarities[i])) for i in top_indices]
+        return retrieve_batch([query], k)[0]
     
+    retrieve.batch = retrieve_batch
     return retrieve
 
 
@@ -200,9 +357,65 @@ def build_retriever(chunks: List[str]):
 # SECTION 4: FIELD EXTRACTION (SUB-CHALLENGE 2)
 # ============================================================================
 
-def extract_field(pattern: str, text: str, flags=re.IGNORECASE) -> str:
-    """Extract first matching group from regex pattern."""
-    match = re.search(pattern, text, flags)
+# Optional linear-time (DFA) regex engine for the field battery, which guards
+# against catastrophic backtracking on the lazy '.*?' patterns.
+# Enable with WELL_RAG_USE_RE2=1 (pip install google-re2).
+_field_re = re
+if os.environ.get('WELL_RAG_USE_RE2') == '1':
+    try:
+        import re2 as _field_re
+    except ImportError:
+        print("[WARN] WELL_RAG_USE_RE2 set but re2 is not installed; using re")
+
+
+def _field_pattern(pattern: str):
+    """Compile a case-insensitive field pattern with the configured engine."""
+    # Inline (?i) is understood by both re and re2, unlike the re.* flag ints
+    return _field_re.compile('(?i)' + pattern)
+
+
+# Field patterns are compiled once at import; all are case-insensitive
+_WELL_NAME_RE = _field_pattern(r'Well\s+Name[:\s]+([^\n]+)')
+_OPERATION_RE = _field_pattern(r'Operation[:\s]+([^\n]+)')
+_START_DATE_RE = _field_pattern(r'Start\s+of\s+Operation[:\s]+([^\n]+)')
+_DURATION_RE = _field_pattern(r'Duration[:\s]+([^\n]+)')
+_TOTAL_DEPTH_RE = _field_pattern(r'(?:Well\s+)?Total\s+Depth[:\s]+([^\n]+)')
+_PACKER_DEPTH_RE = _field_pattern(
+    r'Set\s+(?:liner\s+hanger|packer).*?at\s+([0-9\.]+\s*m\s*(?:AHGL|TVDGL)?)'
+)
+_PBR_DEPTH_RE = _field_pattern(
+    r'(?:PBR|mule\s+shoe).*?([0-9\.]+\s*m\s*(?:AHGL|TVDGL)?)'
+)
+_PUMP_INTAKE_DEPTH_RE = _field_pattern(
+    r'(?:pump\s+intake|ESP).*?([0-9\.]+\s*m\s*(?:AHGL|TVDGL)?)'
+)
+_TUBING_SIZE_RE = _field_pattern(r'([0-9\-/]+)\s*["\']?\s+(?:tubing|casing)')
+_ESP_RE = _field_pattern(r'\bESP\b')
+_RESERVOIR_TEMP_RE = _field_pattern(
+    r'(?:Bottom\s+Hole|Reservoir)\s+[Tt]emperature[:\s]*([0-9]+)\s*°?C'
+)
+_FLUID_TYPE_RE = _field_pattern(r'(?:Reservoir\s+)?[Ff]luid[:\s]*([^\n]+)')
+_WELLHEAD_PRESSURE_RE = _field_pattern(
+    r'(?:Wellhead|WHP)\s+[Pp]ressure[:\s]*([0-9\.]+)\s*bar'
+)
+_FLOW_RATE_RE = _field_pattern(
+    r'(?:Flow\s+[Rr]ate|Production)[:\s]*([0-9\.]+)\s*(?:m[³3]/?h|m3/h)'
+)
+_FLUID_DENSITY_RE = _field_pattern(
+    r'(?:Fluid\s+)?[Dd]ensity[:\s]*([0-9\.]+)\s*(?:kg/m[³3]|kg/m3)'
+)
+_FLUID_VISCOSITY_RE = _field_pattern(r'[Vv]iscosity[:\s]*([0-9\.]+)\s*cP')
+_NO_INCIDENTS_RE = _field_pattern(r'No\s+incidents')
+
+_DEPTH_M_RE = re.compile(r'([0-9]+(?:\.[0-9]+)?)\s*m')
+_NUMBER_RE = re.compile(r'[0-9\.]+')
+
+
+def extract_field(pattern, text: str, flags=re.IGNORECASE) -> str:
+    """Extract first matching group from a regex pattern (string or precompiled)."""
+    if isinstance(pattern, str):
+        pattern = re.compile(pattern, flags)
+    match = pattern.search(text)
     return match.group(1).strip() if match else ""
 
 
@@ -220,7 +433,7 @@ def parse_depth(depth_str: str) -> float:
         return math.nan
     
     # Match number followed by optional unit
-    match = re.search(r'([0-9]+(?:\.[0-9]+)?)\s*m', depth_str.replace(',', '.'))
+    match = _DEPTH_M_RE.search(depth_str.replace(',', '.'))
     return float(match.group(1)) if match else math.nan
 
 
@@ -238,70 +451,41 @@ def extract_well_parameters(text: str) -> Dict[str, Any]:
     params = {}
     
     # Basic well information
-    params['well_name'] = extract_field(r'Well\s+Name[:\s]+([^\n]+)', text)
-    params['operation'] = extract_field(r'Operation[:\s]+([^\n]+)', text)
-    params['start_date'] = extract_field(r'Start\s+of\s+Operation[:\s]+([^\n]+)', text)
-    params['duration'] = extract_field(r'Duration[:\s]+([^\n]+)', text)
-    params['total_depth'] = extract_field(r'(?:Well\s+)?Total\s+Depth[:\s]+([^\n]+)', text)
+    params['well_name'] = extract_field(_WELL_NAME_RE, text)
+    params['operation'] = extract_field(_OPERATION_RE, text)
+    params['start_date'] = extract_field(_START_DATE_RE, text)
+    params['duration'] = extract_field(_DURATION_RE, text)
+    params['total_depth'] = extract_field(_TOTAL_DEPTH_RE, text)
     
     # Critical depths for nodal analysis
-    params['packer_depth_m'] = extract_field(
-        r'Set\s+(?:liner\s+hanger|packer).*?at\s+([0-9\.]+\s*m\s*(?:AHGL|TVDGL)?)', 
-        text
-    )
+    params['packer_depth_m'] = extract_field(_PACKER_DEPTH_RE, text)
     
-    params['pbr_depth_m'] = extract_field(
-        r'(?:PBR|mule\s+shoe).*?([0-9\.]+\s*m\s*(?:AHGL|TVDGL)?)', 
-        text
-    )
+    params['pbr_depth_m'] = extract_field(_PBR_DEPTH_RE, text)
     
-    params['pump_intake_depth_m'] = extract_field(
-        r'(?:pump\s+intake|ESP).*?([0-9\.]+\s*m\s*(?:AHGL|TVDGL)?)',
-        text
-    )
+    params['pump_intake_depth_m'] = extract_field(_PUMP_INTAKE_DEPTH_RE, text)
     
     # Equipment specifications
-    params['tubing_size'] = extract_field(r'([0-9\-/]+)\s*["\']?\s+(?:tubing|casing)', text)
-    params['esp_installed'] = bool(re.search(r'\bESP\b', text, re.IGNORECASE))
+    params['tubing_size'] = extract_field(_TUBING_SIZE_RE, text)
+    params['esp_installed'] = bool(_ESP_RE.search(text))
     
     # Reservoir data (critical for nodal analysis)
-    params['reservoir_temp_c'] = extract_field(
-        r'(?:Bottom\s+Hole|Reservoir)\s+[Tt]emperature[:\s]*([0-9]+)\s*°?C',
-        text
-    )
+    params['reservoir_temp_c'] = extract_field(_RESERVOIR_TEMP_RE, text)
     
-    params['fluid_type'] = extract_field(
-        r'(?:Reservoir\s+)?[Ff]luid[:\s]*([^\n]+)',
-        text
-    )
+    params['fluid_type'] = extract_field(_FLUID_TYPE_RE, text)
     
     # Pressure data
-    params['wellhead_pressure_bar'] = extract_field(
-        r'(?:Wellhead|WHP)\s+[Pp]ressure[:\s]*([0-9\.]+)\s*bar',
-        text
-    )
+    params['wellhead_pressure_bar'] = extract_field(_WELLHEAD_PRESSURE_RE, text)
     
     # Flow rate
-    params['flow_rate_m3h'] = extract_field(
-        r'(?:Flow\s+[Rr]ate|Production)[:\s]*([0-9\.]+)\s*(?:m[³3]/?h|m3/h)',
-        text
-    )
+    params['flow_rate_m3h'] = extract_field(_FLOW_RATE_RE, text)
     
     # Fluid properties
-    params['fluid_density_kg_m3'] = extract_field(
-        r'(?:Fluid\s+)?[Dd]ensity[:\s]*([0-9\.]+)\s*(?:kg/m[³3]|kg/m3)',
-        text
-    )
+    params['fluid_density_kg_m3'] = extract_field(_FLUID_DENSITY_RE, text)
     
-    params['fluid_viscosity_cp'] = extract_field(
-        r'[Vv]iscosity[:\s]*([0-9\.]+)\s*cP',
-        text
-    )
+    params['fluid_viscosity_cp'] = extract_field(_FLUID_VISCOSITY_RE, text)
     
     # HSE information
-    params['hse_incidents'] = 'None' if re.search(
-        r'No\s+incidents', text, re.IGNORECASE
-    ) else 'Check required'
+    params['hse_incidents'] = 'None' if _NO_INCIDENTS_RE.search(text) else 'Check required'
     
     print(f"[INFO] Extracted {len([v for v in params.values() if v])} parameters")
     return params
@@ -325,7 +509,7 @@ def extract_nodal_inputs(text: str, params: Dict[str, Any]) -> Dict[str, float]:
     if params.get('wellhead_pressure_bar'):
         try:
             nodal_inputs['wellhead_pressure_bar'] = float(
-                re.search(r'[0-9\.]+', params['wellhead_pressure_bar']).group()
+                _NUMBER_RE.search(params['wellhead_pressure_bar']).group()
             )
         except:
             nodal_inputs['wellhead_pressure_bar'] = 10.0
@@ -336,7 +520,7 @@ def extract_nodal_inputs(text: str, params: Dict[str, Any]) -> Dict[str, float]:
     if params.get('flow_rate_m3h'):
         try:
             nodal_inputs['flow_rate_m3_h'] = float(
-                re.search(r'[0-9\.]+', params['flow_rate_m3h']).group()
+                _NUMBER_RE.search(params['flow_rate_m3h']).group()
             )
         except:
             nodal_inputs['flow_rate_m3_h'] = 50.0
@@ -355,7 +539,7 @@ def extract_nodal_inputs(text: str, params: Dict[str, Any]) -> Dict[str, float]:
                 nodal_inputs['tubing_inner_diameter_in'] = whole + int(frac[0]) / int(frac[1])
             else:
                 nodal_inputs['tubing_inner_diameter_in'] = float(
-                    re.search(r'[0-9\.]+', tubing_str).group()
+                    _NUMBER_RE.search(tubing_str).group()
                 )
         except:
             nodal_inputs['tubing_inner_diameter_in'] = 7.0
@@ -366,7 +550,7 @@ def extract_nodal_inputs(text: str, params: Dict[str, Any]) -> Dict[str, float]:
     if params.get('fluid_density_kg_m3'):
         try:
             nodal_inputs['fluid_density_kg_m3'] = float(
-                re.search(r'[0-9\.]+', params['fluid_density_kg_m3']).group()
+                _NUMBER_RE.search(params['fluid_density_kg_m3']).group()
             )
         except:
             # Brine typical density
@@ -378,7 +562,7 @@ def extract_nodal_inputs(text: str, params: Dict[str, Any]) -> Dict[str, float]:
     if params.get('fluid_viscosity_cp'):
         try:
             nodal_inputs['fluid_viscosity_cP'] = float(
-                re.search(r'[0-9\.]+', params['fluid_viscosity_cp']).group()
+                _NUMBER_RE.search(params['fluid_viscosity_cp']).group()
             )
         except:
             nodal_inputs['fluid_viscosity_cP'] = 1.0
@@ -389,7 +573,7 @@ def extract_nodal_inputs(text: str, params: Dict[str, Any]) -> Dict[str, float]:
     if params.get('reservoir_temp_c'):
         try:
             nodal_inputs['reservoir_temperature_c'] = float(
-                re.search(r'[0-9\.]+', params['reservoir_temp_c']).group()
+                _NUMBER_RE.search(params['reservoir_temp_c']).group()
             )
         except:
             nodal_inputs['reservoir_temperature_c'] = 80.0
@@ -551,6 +735,43 @@ def calculate_nodal_analysis(inputs: Dict[str, float]) -> Dict[str, Any]:
 # SECTION 6: SUMMARIZATION (SUB-CHALLENGE 1)
 # ============================================================================
 
+# Minimum retrieval score for a passage to be quoted in the summary
+SUMMARY_RELEVANCE_THRESHOLD = 0.1
+
+_SENTENCE_END_RE = re.compile(r'[.!?]\s')
+_WORD_RE = re.compile(r'\S+')
+
+
+def first_sentence(text: str) -> str:
+    """
+    Return the first sentence of text (up to and including its end mark).
+    
+    Stops at the first match instead of splitting the whole chunk into
+    sentences only to keep the first one.
+    """
+    match = _SENTENCE_END_RE.search(text)
+    return text[:match.start() + 1] if match else text
+
+
+def enforce_word_limit(text: str, word_limit: int) -> str:
+    """
+    Truncate text to at most word_limit words.
+    
+    Scans words lazily and slices the original string at the end of the
+    last kept word, so text beyond the limit is never tokenized. A cut
+    that does not end on a full stop is marked with "...".
+    """
+    start = end = 0
+    for n, match in enumerate(_WORD_RE.finditer(text)):
+        if n == word_limit:
+            truncated = text[start:end]
+            return truncated if truncated.endswith('.') else truncated + "..."
+        if n == 0:
+            start = match.start()
+        end = match.end()
+    return text
+
+
 def generate_summary(
     text: str,
     params: Dict[str, Any],
@@ -624,28 +845,36 @@ def generate_summary(
             "equipment installation completion status"
         ]
         
-        for query in queries:
+        hits_per_query = None
+        
+        # Retrievers from build_retriever score all queries in one mat-mul
+        retrieve_batch = getattr(retrieve_func, 'batch', None)
+        if retrieve_batch:
+            try:
+                hits_per_query = retrieve_batch(queries, k=2)
+            except Exception:
+                hits_per_query = None
+        
+        # Otherwise (or if the batch failed) query one at a time, so a
+        # failing query only loses its own passages
+        if hits_per_query is None:
+            hits_per_query = []
+            for query in queries:
+                try:
+                    hits_per_query.append(retrieve_func(query, k=2))
+                except Exception:
+                    hits_per_query.append([])
+        
+        for chunks in hits_per_query:
             try:
-                chunks = retrieve_func(query, k=2)
                 for chunk, score in chunks:
-                    if score > 0.1:  # Relevance threshold
-                        sentences = re.split(r'(?<=[.!?])\s+', chunk)
-                        if sentences:
-                            summary_parts.append(sentences[0])
-            except:
+                    if score > SUMMARY_RELEVANCE_THRESHOLD:
+                        summary_parts.append(first_sentence(chunk))
+            except Exception:
                 pass
     
     # Combine and enforce word limit
-    full_summary = " ".join(summary_parts)
-    words = full_summary.split()
-    
-    if len(words) > word_limit:
-        words = words[:word_limit]
-        full_summary = " ".join(words)
-        if not full_summary.endswith('.'):
-            full_summary += "..."
-    
-    return full_summary
+    return enforce_word_limit(" ".join(summary_parts), word_limit)
 
 
 # ============================================================================
@@ -702,9 +931,10 @@ class WellAnalysisAgent:
     5. Validate and report
     """
     
-    def __init__(self, pdf_path: str, word_limit: int = 250):
+    def __init__(self, pdf_path: str, word_limit: int = 250, cache_dir: Optional[str] = None):
         self.pdf_path = pdf_path
         self.word_limit = word_limit
+        self.cache_dir = cache_dir
         self.text = None
         self.params = None
         self.nodal_inputs = None
@@ -728,7 +958,7 @@ class WellAnalysisAgent:
         # Step 2: Build retrieval system
         print("[STEP 2] Building retrieval system...")
         chunks = chunk_text(self.text)
-        self.retrieve_func = build_retriever(chunks)
+        self.retrieve_func = build_retriever(chunks, cache_dir=self.cache_dir)
         print(f"[STEP 2] ✓ Retrieval system ready\n")
         
         # Step 3: Extract parameters
@@ -806,6 +1036,32 @@ class WellAnalysisAgent:
 # SECTION 9: OUTPUT GENERATION
 # ============================================================================
 
+# orjson is several times faster than the stdlib encoder; fall back if absent
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def write_json(obj: Any, path: str):
+    """Write obj as 2-space indented UTF-8 JSON."""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2, ensure_ascii=False)
+
+
+def read_json(path: str) -> Any:
+    """Read a JSON file."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
 def save_results(report: Dict[str, Any], output_dir: str):
     """
     Save analysis results in multiple formats.
@@ -818,8 +1074,7 @@ def save_results(report: Dict[str, Any], output_dir: str):
     
     # Save JSON report
     json_path = os.path.join(output_dir, 'analysis_report.json')
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    write_json(report, json_path)
     print(f"✓ Saved JSON report: {json_path}")
     
     # Save Markdown summary
@@ -995,12 +1250,11 @@ Examples:
         # Save image extraction results
         os.makedirs(args.output, exist_ok=True)
         result_path = os.path.join(args.output, 'image_extraction.json')
-        with open(result_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'source_image': args.image,
-                'extraction_date': datetime.now().isoformat(),
-                'extracted_parameters': params
-            }, f, indent=2)
+        write_json({
+            'source_image': args.image,
+            'extraction_date': datetime.now().isoformat(),
+            'extracted_parameters': params
+        }, result_path)
         
         print(f"\n✓ Results saved to: {result_path}\n")
         return 0
@@ -1011,13 +1265,13 @@ Examples:
         return 1
     
     # Initialize agent
-    agent = WellAnalysisAgent(args.pdf, args.words)
+    # Fitted retrievers are cached next to the results for warm re-runs
+    agent = WellAnalysisAgent(args.pdf, args.words, cache_dir=os.path.join(args.output, '.cache'))
     
     # Override nodal inputs if provided
     if args.nodal_json and os.path.exists(args.nodal_json):
         print(f"[INFO] Loading custom nodal inputs from: {args.nodal_json}")
-        with open(args.nodal_json, 'r') as f:
-            custom_inputs = json.load(f)
+        custom_inputs = read_json(args.nodal_json)
         print(f"[INFO] Custom inputs loaded: {list(custom_inputs.keys())}\n")
     
     # Run workflow